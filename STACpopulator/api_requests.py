@@ -2,15 +2,20 @@ import logging
 import os
 from typing import Any, Optional, Union
 
+import orjson
 import requests
 from requests import Session
 
+from STACpopulator.request_utils import default_session
+
 LOGGER = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 def stac_host_reachable(url: str, session: Optional[Session] = None) -> bool:
     try:
-        session = session or requests
+        session = session or default_session()
         response = session.get(url, headers={"Accept": "application/json"})
         response.raise_for_status()
         body = response.json()
@@ -27,7 +32,7 @@ def stac_collection_exists(stac_host: str, collection_id: str, session: Optional
 
     Returns the collection JSON.
     """
-    session = session or requests
+    session = session or default_session()
     r = session.get(os.path.join(stac_host, "collections", collection_id), verify=False)
     return r.status_code == 200
 
@@ -48,17 +53,18 @@ def post_stac_collection(
     :type update: Optional[bool], optional
     :param session: Session with additional configuration to perform requests.
     """
-    session = session or requests
+    session = session or default_session()
     collection_id = json_data["id"]
     collection_url = os.path.join(stac_host, "collections")
-    r = session.post(collection_url, json=json_data)
+    body = orjson.dumps(json_data, option=orjson.OPT_SERIALIZE_NUMPY)
+    r = session.post(collection_url, data=body, headers=JSON_HEADERS)
 
     if r.status_code == 200:
         LOGGER.info(f"Collection {collection_id} successfully created")
     elif r.status_code == 409:
         if update:
             LOGGER.info(f"Collection {collection_id} already exists. Updating.")
-            r = session.put(os.path.join(stac_host, "collections"), json=json_data)
+            r = session.put(os.path.join(stac_host, "collections"), data=body, headers=JSON_HEADERS)
             r.raise_for_status()
         else:
             LOGGER.info(f"Collection {collection_id} already exists.")
@@ -88,21 +94,57 @@ def post_stac_item(
     :type update: Optional[bool], optional
     :param session: Session with additional configuration to perform requests.
     """
-    session = session or requests
+    session = session or default_session()
     item_id = json_data["id"]
     item_url = os.path.join(stac_host, f"collections/{collection_id}/items")
-    r = session.post(item_url, json=json_data)
+    # serialize once with orjson rather than letting requests encode the item with the slower stdlib json
+    body = orjson.dumps(json_data, option=orjson.OPT_SERIALIZE_NUMPY)
+    r = session.post(item_url, data=body, headers=JSON_HEADERS)
 
     extra_log_info = {"item_id": item_id, "item_url": os.path.join(item_url, item_id)}
 
     if r.status_code == 200:
-        LOGGER.info(f"Item {item_name} successfully added", extra=extra_log_info)
+        LOGGER.info("Item %s successfully added", item_name, extra=extra_log_info)
     elif r.status_code == 409:
         if update:
-            LOGGER.info(f"Item {item_id} already exists. Updating.", extra=extra_log_info)
-            r = session.put(os.path.join(stac_host, f"collections/{collection_id}/items/{item_id}"), json=json_data)
+            LOGGER.info("Item %s already exists. Updating.", item_id, extra=extra_log_info)
+            r = session.put(
+                os.path.join(stac_host, f"collections/{collection_id}/items/{item_id}"),
+                data=body,
+                headers=JSON_HEADERS,
+            )
             r.raise_for_status()
         else:
-            LOGGER.warn(f"Item {item_id} already exists.", extra=extra_log_info)
+            LOGGER.warning("Item %s already exists.", item_id, extra=extra_log_info)
     else:
         r.raise_for_status()
+
+
+def post_stac_items_bulk(
+    stac_host: str,
+    collection_id: str,
+    json_data: list[dict[str, Any]],
+    update: Optional[bool] = True,
+    session: Optional[Session] = None,
+) -> None:
+    """Post multiple STAC items at once using the bulk items endpoint of the STAC API Transaction Extension.
+
+    :param stac_host: address of the STAC host
+    :type stac_host: str
+    :param collection_id: ID of the collection to which to post these items
+    :type collection_id: str
+    :param json_data: JSON representations of the STAC items
+    :type json_data: list[dict[str, Any]]
+    :param update: if True, update the items on the host server if they are already present, defaults to True
+    :type update: Optional[bool], optional
+    :param session: Session with additional configuration to perform requests.
+    """
+    session = session or default_session()
+    items_url = os.path.join(stac_host, f"collections/{collection_id}/bulk_items")
+    body = {
+        "items": {item["id"]: item for item in json_data},
+        "method": "upsert" if update else "insert",
+    }
+    r = session.post(items_url, data=orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY), headers=JSON_HEADERS)
+    r.raise_for_status()
+    LOGGER.info("%s items successfully added", len(json_data), extra={"item_url": items_url})
@@ -1,4 +1,3 @@
-import json
 from datetime import datetime
 from typing import (
     Any,
@@ -213,7 +212,7 @@ class CMIP6Extension(
         """
         if isinstance(properties, dict):
             properties = CMIP6Properties(**properties)
-        data_json = json.loads(properties.model_dump_json(by_alias=True))
+        data_json = properties.model_dump(mode="json", by_alias=True)
         for prop, val in data_json.items():
             self._set_property(prop, val)
 
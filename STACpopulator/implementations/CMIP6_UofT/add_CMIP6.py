@@ -1,5 +1,4 @@
 import argparse
-import json
 import logging
 import os
 import sys
@@ -17,7 +16,7 @@ from STACpopulator.extensions.datacube import DataCubeHelper
 from STACpopulator.extensions.thredds import THREDDSExtension, THREDDSHelper
 from STACpopulator.input import ErrorLoader, GenericLoader, THREDDSLoader
 from STACpopulator.models import GeoJSONPolygon
-from STACpopulator.populator_base import STACpopulatorBase
+from STACpopulator.populator_base import STACpopulatorBase, add_ingest_options
 
 LOGGER = logging.getLogger(__name__)
 
@@ -33,15 +32,28 @@ class CMIP6populator(STACpopulatorBase):
         update: Optional[bool] = False,
         session: Optional[Session] = None,
         config_file: Optional[Union[os.PathLike[str], str]] = None,
+        max_workers: int = 8,
+        batch_size: Optional[int] = None,
     ) -> None:
         """Constructor
 
         :param stac_host: URL to the STAC API
         :type stac_host: str
         :param data_loader: loader to iterate over ingestion data.
+        :param max_workers: number of STAC items created and posted concurrently (in no particular order) during
+          ingestion.
+        :type max_workers: int
+        :param batch_size: if set, number of STAC items posted at once using the bulk items endpoint.
+        :type batch_size: int, optional
         """
         super().__init__(
-            stac_host, data_loader, update=update, session=session, config_file=config_file
+            stac_host,
+            data_loader,
+            update=update,
+            session=session,
+            config_file=config_file,
+            max_workers=max_workers,
+            batch_size=batch_size,
         )
 
     def create_stac_item(
@@ -83,8 +95,7 @@ class CMIP6populator(STACpopulatorBase):
         except STACValidationError as e:
             raise Exception("Failed to validate STAC item") from e
 
-        # print(json.dumps(item.to_dict()))
-        return json.loads(json.dumps(item.to_dict()))
+        return item.to_dict()
 
 
 def add_parser_args(parser: argparse.ArgumentParser) -> None:
@@ -106,6 +117,7 @@ def add_parser_args(parser: argparse.ArgumentParser) -> None:
             "By default, uses the adjacent configuration to the implementation class."
         ),
     )
+    add_ingest_options(parser)
     add_request_options(parser)
     add_logging_options(parser)
 
@@ -122,7 +134,13 @@ def runner(ns: argparse.Namespace) -> int:
             data_loader = ErrorLoader()
 
         c = CMIP6populator(
-            ns.stac_host, data_loader, update=ns.update, session=session, config_file=ns.config
+            ns.stac_host,
+            data_loader,
+            update=ns.update,
+            session=session,
+            config_file=ns.config,
+            max_workers=ns.max_workers,
+            batch_size=ns.batch_size,
         )
         c.ingest()
     return 0
@@ -11,7 +11,7 @@ from STACpopulator.log import add_logging_options
 from STACpopulator.request_utils import add_request_options, apply_request_options
 from STACpopulator.input import STACDirectoryLoader
 from STACpopulator.models import GeoJSONPolygon
-from STACpopulator.populator_base import STACpopulatorBase
+from STACpopulator.populator_base import STACpopulatorBase, add_ingest_options
 
 LOGGER = logging.getLogger(__name__)
 
@@ -26,9 +26,13 @@ class DirectoryPopulator(STACpopulatorBase):
         update: bool,
         collection: dict[str, Any],
         session: Optional[Session] = None,
+        max_workers: int = 8,
+        batch_size: Optional[int] = None,
     ) -> None:
         self._collection = collection
-        super().__init__(stac_host, loader, update=update, session=session)
+        super().__init__(
+            stac_host, loader, update=update, session=session, max_workers=max_workers, batch_size=batch_size
+        )
 
     def load_config(self) -> MutableMapping[str, Any]:
         self._collection_info = self._collection
@@ -52,6 +56,7 @@ def add_parser_args(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="Limit search of STAC Collections only to first top-most matches in the crawled directory structure.",
     )
+    add_ingest_options(parser)
     add_request_options(parser)
     add_logging_options(parser)
 
@@ -64,7 +69,15 @@ def runner(ns: argparse.Namespace) -> int:
         for _, collection_path, collection_json in STACDirectoryLoader(ns.directory, "collection", ns.prune):
             collection_dir = os.path.dirname(collection_path)
             loader = STACDirectoryLoader(collection_dir, "item", prune=ns.prune)
-            populator = DirectoryPopulator(ns.stac_host, loader, ns.update, collection_json, session=session)
+            populator = DirectoryPopulator(
+                ns.stac_host,
+                loader,
+                ns.update,
+                collection_json,
+                session=session,
+                max_workers=ns.max_workers,
+                batch_size=ns.batch_size,
+            )
             populator.ingest()
     return 0
 
@@ -5,12 +5,12 @@ from abc import ABC, abstractmethod
 from typing import Any, Iterator, Literal, MutableMapping, Optional, Tuple, Union
 
 import pystac
-import requests
 import siphon
 import xncml
 from requests.sessions import Session
 from siphon.catalog import TDSCatalog, session_manager
 
+from STACpopulator.request_utils import default_session
 from STACpopulator.stac_utils import numpy_to_python_datatypes, url_validate
 
 LOGGER = logging.getLogger(__name__)
@@ -82,14 +82,18 @@ class THREDDSLoader(GenericLoader):
         :param depth: Maximum recursive depth for the class's generator. Setting 0 will return only datasets within the
           top-level catalog. If None, depth is set to 1000, defaults to None
         :type depth: int, optional
+        :param session: Session with additional configuration to perform requests, reused for every catalog and
+          NcML request performed while crawling.
+        :type session: Session, optional
         """
         super().__init__()
         self._max_depth = depth if depth is not None else 1000
         self._depth = 0
+        self._session = session
 
         self.thredds_catalog_URL = self.validate_catalog_url(thredds_catalog_url)
 
-        self.catalog = TDSCatalog(self.thredds_catalog_URL)
+        self.catalog = THREDDSCatalog(self.thredds_catalog_URL, session)
         self.catalog_head = self.catalog
         self.links.append(self.magpie_collection_link())
 
@@ -146,7 +150,8 @@ class THREDDSLoader(GenericLoader):
                 yield item_name, url, attrs
 
         for name, ref in self.catalog_head.catalog_refs.items():
-            self.catalog_head = ref.follow()
+            # same as 'ref.follow()', but keeping the same session across all crawled catalogs
+            self.catalog_head = THREDDSCatalog(ref.href, self._session)
             self._depth -= 1
             yield from self
             self._depth += 1
@@ -157,7 +162,7 @@ class THREDDSLoader(GenericLoader):
     def extract_metadata(self, ds: siphon.catalog.Dataset) -> MutableMapping[str, Any]:
         LOGGER.info("Requesting NcML dataset description")
         url = ds.access_urls["NCML"]
-        r = requests.get(url)
+        r = (self._session or default_session()).get(url)
         # Convert NcML to CF-compliant dictionary
         attrs = xncml.Dataset.from_text(r.text).to_cf_dict()
         attrs["attributes"] = numpy_to_python_datatypes(attrs["attributes"])
@@ -1,17 +1,12 @@
-import datetime as dt
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import List, Literal, Union
 
-from pydantic import (
-    AnyHttpUrl,
-    AnyUrl,
-    BaseModel,
-    Field,
-    SerializeAsAny,
-    field_validator,
-)
+from pydantic import BaseModel, ConfigDict
 
 
 class Geometry(BaseModel):
+    # defer schema construction until the first validation to avoid paying it at import time
+    model_config = ConfigDict(defer_build=True)
+
     type: str
     coordinates: List
 
@@ -1,26 +1,162 @@
+import argparse
 import functools
 import inspect
-import json
 import logging
 import os
+import queue
+import re
+import threading
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
-from typing import Any, Dict, List, MutableMapping, Optional, Type, Union
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple, Type, TypeVar, Union
 
+import orjson
 import pystac
+from requests import HTTPError
 from requests.sessions import Session
 
 from STACpopulator.api_requests import (
     post_stac_collection,
     post_stac_item,
+    post_stac_items_bulk,
     stac_host_reachable,
 )
 from STACpopulator.input import GenericLoader
 from STACpopulator.models import AnyGeometry
+from STACpopulator.request_utils import create_session
 from STACpopulator.stac_utils import load_config, url_validate
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_REQUIRED_COLLECTION_DEFINITIONS = frozenset(["title", "id", "description", "keywords", "license"])
+# characters of STAC item IDs that cannot be used safely in the name of their error dump file
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.-]")
+
+
+def _parse_extent_date(date: Optional[str]) -> Optional[datetime]:
+    """Parse a ``YYYY-MM-DD`` date of the collection temporal extent, where ``None`` denotes an open interval.
+
+    Uses the C implementation of :meth:`datetime.fromisoformat`, falling back to :meth:`datetime.strptime`
+    for the rare values it does not accept (e.g.: non zero-padded months or days).
+    """
+    if date is None:
+        return None
+    try:
+        return datetime.fromisoformat(date)
+    except ValueError:
+        return datetime.strptime(date, "%Y-%m-%d")
+
+
+def _build_extent(spatial: List[float], temporal: List[Optional[str]]) -> pystac.Extent:
+    """Create the extent of a collection from its bounding box and ``YYYY-MM-DD`` start and end dates."""
+    sp_extent = pystac.SpatialExtent([spatial])
+    tmp_extent = pystac.TemporalExtent([[_parse_extent_date(temporal[0]), _parse_extent_date(temporal[1])]])
+    return pystac.Extent(sp_extent, tmp_extent)
+
+
+@functools.cache
+def _default_config_path(populator_cls: type) -> str:
+    """Path of the collection configuration file adjacent to the module defining the populator class."""
+    impl_dir = os.path.dirname(inspect.getfile(populator_cls))
+    return os.path.join(impl_dir, "collection_config.yml")
+
+
+# hosts successfully validated with each session, dropped along with the session once it is no longer used
+_validated_stac_hosts: "weakref.WeakKeyDictionary[Session, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def _validate_stac_host(stac_host: str, session: Session) -> str:
+    """Validate the STAC host URL and its reachability.
+
+    Successful validations are remembered per host and session, such that populators sharing them only check it once.
+    """
+    validated_hosts = _validated_stac_hosts.setdefault(session, set())
+    if stac_host in validated_hosts:
+        return stac_host
+    if not url_validate(stac_host):
+        raise ValueError("stac_host URL is not appropriately formatted")
+    if not stac_host_reachable(stac_host, session=session):
+        raise RuntimeError("stac_host is not reachable")
+
+    validated_hosts.add(stac_host)
+    return stac_host
+
+
+def _prefetch(iterable: Iterable[T], maxsize: int) -> Iterator[T]:
+    """Iterate over ``iterable`` from a background thread, loading up to ``maxsize`` entries ahead of the consumer.
+
+    Any error raised while iterating is re-raised to the consumer once the entries loaded before it were consumed.
+    If the consumer stops early (the generator is closed), the background thread stops loading further entries.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    errors = []
+
+    def put(entry: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for entry in iterable:
+                if not put(entry):
+                    return
+        except BaseException as exc:
+            # including exits, such that the consumer does not mistake an interrupted iteration for a complete one
+            errors.append(exc)
+        finally:
+            put(done)
+
+    threading.Thread(target=produce, name="STACpopulator-loader", daemon=True).start()
+    try:
+        while (entry := buffer.get()) is not done:
+            yield entry
+    finally:
+        stop.set()
+    if errors:
+        raise errors[0]
+
+
+def _positive_int(value: str) -> int:
+    """Parse a command line argument that must be a strictly positive integer."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def add_ingest_options(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds arguments to a parser to configure how a populator ingests its items.
+    """
+    parser.add_argument(
+        "--max-workers",
+        type=_positive_int,
+        default=8,
+        help=(
+            "Number of STAC Items created and posted concurrently, in no particular order, during ingestion. "
+            "Use 1 to create and post them one at a time in loading order."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=_positive_int,
+        help=(
+            "Post STAC Items in batches of this size using the bulk items endpoint of the STAC API Transaction "
+            "Extension. By default, STAC Items are posted one by one."
+        ),
+    )
+
 
 class STACpopulatorBase(ABC):
     def __init__(
@@ -30,6 +166,8 @@ class STACpopulatorBase(ABC):
         update: bool = False,
         session: Optional[Session] = None,
         config_file: Optional[Union[os.PathLike[str], str]] = "collection_config.yml",
+        max_workers: int = 8,
+        batch_size: Optional[int] = None,
     ) -> None:
         """Constructor
 
@@ -37,21 +175,56 @@ class STACpopulatorBase(ABC):
         :type stac_host: str
         :param data_loader: A concrete implementation of the GenericLoader abstract base class
         :type data_loader: GenericLoader
+        :param session: Session with additional configuration to perform requests. If omitted, a session pooling
+          connections to the STAC API is created for the populator and closed once ingestion completes.
+        :type session: Session, optional
+        :param max_workers: Maximum number of items created and posted concurrently during ingestion.
+          Unless set to 1, ``create_stac_item`` is called from several threads at once and items are posted
+          in no particular order.
+        :type max_workers: int
+        :param batch_size: If set, STAC items are posted in batches of this size using the bulk items endpoint of
+          the STAC API Transaction Extension, falling back to posting them one by one if a batch is rejected or
+          if the STAC API does not provide that endpoint.
+        :type batch_size: int, optional
         :raises RuntimeError: Raised if one of the required definitions is not found in the collection info filename
+        :raises ValueError: Raised if ``max_workers`` or ``batch_size`` is not a positive integer
         """
+        # checked before anything is published to the STAC API, ingestion could not run otherwise
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be a positive integer, got {max_workers}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
 
         self._collection_config_path = config_file
         self._collection_info: MutableMapping[str, Any] = None
-        self._session = session
+        self._collection_data: Optional[dict[str, Any]] = None
         self.load_config()
+        # resolved once since the collection ID is needed by every posted item
+        self._collection_id = self._collection_info["id"]
+        self._collection_name = self._collection_info["title"]
 
         self._ingest_pipeline = data_loader
-        self._stac_host = self.validate_host(stac_host)
         self.update = update
-
-        LOGGER.info("Initialization complete")
-        LOGGER.info(f"Collection {self.collection_name} is assigned ID {self.collection_id}")
-        self.create_stac_collection()
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._item_batch: List[Tuple[str, str, dict[str, Any]]] = []
+        self._item_batch_lock = threading.Lock()
+        self._bulk_supported = True
+
+        self._owns_session = session is None
+        # one pooled connection per worker avoids reconnecting to the STAC API while posting items concurrently
+        self._session = create_session(pool_size=max_workers) if session is None else session
+        try:
+            self._stac_host = self.validate_host(stac_host)
+
+            LOGGER.info("Initialization complete")
+            LOGGER.info(f"Collection {self.collection_name} is assigned ID {self.collection_id}")
+            self._collection_data = self.create_stac_collection()
+        except BaseException:
+            # ingestion will never run to close it
+            if self._owns_session:
+                self._session.close()
+            raise
 
     def load_config(self):
         """
@@ -61,26 +234,25 @@ class STACpopulatorBase(ABC):
         """
         # use explicit override, or default to local definition
         if not self._collection_config_path or not os.path.isfile(self._collection_config_path):
-            impl_path = inspect.getfile(self.__class__)
-            impl_dir = os.path.dirname(impl_path)
-            impl_cfg = os.path.join(impl_dir, "collection_config.yml")
-            self._collection_config_path = impl_cfg
+            self._collection_config_path = _default_config_path(type(self))
 
         LOGGER.info("Using populator collection configuration file: [%s]", self._collection_config_path)
         collection_info = load_config(self._collection_config_path)
 
-        req_definitions = ["title", "id", "description", "keywords", "license"]
-        for req in req_definitions:
-            if req not in collection_info.keys():
-                mgs = f"'{req}' is required in the configuration file [{self._collection_config_path}]"
-                LOGGER.error(mgs)
-                raise RuntimeError(mgs)
+        missing = _REQUIRED_COLLECTION_DEFINITIONS.difference(collection_info)
+        if missing:
+            mgs = (
+                f"Missing required definitions {', '.join(sorted(missing))} "
+                f"in the configuration file [{self._collection_config_path}]"
+            )
+            LOGGER.error(mgs)
+            raise RuntimeError(mgs)
 
         self._collection_info = collection_info
 
     @property
     def collection_name(self) -> str:
-        return self._collection_info["title"]
+        return self._collection_name
 
     @property
     def stac_host(self) -> str:
@@ -88,7 +260,7 @@ class STACpopulatorBase(ABC):
 
     @property
     def collection_id(self) -> str:
-        return self._collection_info["id"]
+        return self._collection_id
 
     @property
     @abstractmethod
@@ -100,47 +272,44 @@ class STACpopulatorBase(ABC):
 
     @abstractmethod
     def create_stac_item(self, item_name: str, item_data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Create the STAC item of a data item provided by the loader, or ``None`` if it should not be published.
+
+        Items are created by up to ``max_workers`` threads during ingestion. Implementations must therefore be
+        thread-safe and must not rely on being called for the loaded items one at a time or in their loading order.
+        """
         raise NotImplementedError
 
     def validate_host(self, stac_host: str) -> str:
-        if not url_validate(stac_host):
-            raise ValueError("stac_host URL is not appropriately formatted")
-        if not stac_host_reachable(stac_host, session=self._session):
-            raise RuntimeError("stac_host is not reachable")
-
-        return stac_host
+        return _validate_stac_host(stac_host, self._session)
 
     # FIXME: should provide a way to update after item generation
     #   STAC collections are supposed to include 'summaries' with
     #   an aggregation of all supported 'properties' by its child items
-    @functools.cache
     def create_stac_collection(self) -> dict[str, Any]:
         """
         Create a basic STAC collection.
 
-        Returns the collection.
+        Returns the collection. The collection is only created and published once, subsequent calls return it as is.
         """
+        if self._collection_data is not None:
+            return self._collection_data
+
         LOGGER.info(f"Creating collection '{self.collection_name}'")
-        sp_extent = pystac.SpatialExtent([self._collection_info.pop("spatialextent")])
-        tmp = self._collection_info.pop("temporalextent")
-        tmp_extent = pystac.TemporalExtent(
-            [
-                [
-                    datetime.strptime(tmp[0], "%Y-%m-%d") if tmp[0] is not None else None,
-                    datetime.strptime(tmp[1], "%Y-%m-%d") if tmp[1] is not None else None,
-                ]
-            ]
+        # work on a copy to leave the loaded configuration untouched
+        collection_info = dict(self._collection_info)
+        collection_info["extent"] = _build_extent(
+            collection_info.pop("spatialextent"), collection_info.pop("temporalextent")
         )
-        self._collection_info["extent"] = pystac.Extent(sp_extent, tmp_extent)
-        self._collection_info["summaries"] = pystac.Summaries({"needs_summaries_update": ["true"]})
+        collection_info["summaries"] = pystac.Summaries({"needs_summaries_update": ["true"]})
 
         # Add any assets if provided in the config
-        self._collection_info["assets"] = self.__make_collection_assets()
+        collection_info["assets"] = self.__make_collection_assets(collection_info.pop("assets", {}))
 
         # Construct links if provided in the config. This needs to be done before constructing a collection object.
-        collection_links = self.__make_collection_links()
+        collection_links = self.__make_collection_links(collection_info.pop("links", []))
 
-        collection = pystac.Collection(**self._collection_info)
+        collection = pystac.Collection(**collection_info)
 
         if collection_links:
             collection.add_links(collection_links)
@@ -149,29 +318,25 @@ class STACpopulatorBase(ABC):
         self.publish_stac_collection(collection_data)
         return collection_data
 
-    def __make_collection_links(self) -> List[pystac.Link]:
+    def __make_collection_links(self, config_links: List[dict[str, Any]]) -> List[pystac.Link]:
         """Create collection level links based on data read in from the configuration file.
 
+        :param config_links: Link definitions from the configuration file
+        :type config_links: List[dict[str, Any]]
         :return: List of pystac Link objects
         :rtype: List[pystac.Link]
         """
-        links = []
-        config_links = self._collection_info.pop("links", {})
-        for link_info in config_links:
-            links.append(pystac.Link(**link_info))
-        return links
+        return [pystac.Link(**link_info) for link_info in config_links]
 
-    def __make_collection_assets(self) -> Dict[str, pystac.Asset]:
+    def __make_collection_assets(self, config_assets: dict[str, dict[str, Any]]) -> Dict[str, pystac.Asset]:
         """Creates collection level assets based on data read in from the configuration file.
 
+        :param config_assets: Asset definitions from the configuration file, by asset name
+        :type config_assets: dict[str, dict[str, Any]]
         :return: Dictionary of pystac Asset objects
         :rtype: Dict[pystac.Asset]
         """
-        pystac_assets = {}
-        if "assets" in self._collection_info:
-            for asset_name, asset_info in self._collection_info["assets"].items():
-                pystac_assets[asset_name] = pystac.Asset(**asset_info)
-        return pystac_assets
+        return {asset_name: pystac.Asset(**asset_info) for asset_name, asset_info in config_assets.items()}
 
     def publish_stac_collection(self, collection_data: dict[str, Any]) -> None:
         post_stac_collection(self.stac_host, collection_data, self.update, session=self._session)
@@ -179,43 +344,136 @@ class STACpopulatorBase(ABC):
     def ingest(self) -> None:
         counter = 0
         failures = 0
+        # limit how many loaded items can wait for a worker to avoid holding the whole pipeline in memory
+        max_pending = 2 * self.max_workers
         LOGGER.info("Data ingestion")
-        for item_name, item_loc, item_data in self._ingest_pipeline:
-            LOGGER.info(f"New data item: {item_name}", extra={"item_loc": item_loc})
+        # keep loading items while workers are busy and ingestion waits for one of them to become available
+        loaded_items = _prefetch(self._ingest_pipeline, max_pending)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = set()
+                for item_name, item_loc, item_data in loaded_items:
+                    LOGGER.info("New data item: %s", item_name, extra={"item_loc": item_loc})
+                    pending.add(executor.submit(self._ingest_item, item_name, item_loc, item_data))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        counter += len(done)
+                        failures += sum(future.result() for future in done)
+                        LOGGER.info("Processed %s data items. %s failures", counter, failures)
+
+                for future in as_completed(pending):
+                    counter += 1
+                    failures += future.result()
+                    LOGGER.info("Processed %s data items. %s failures", counter, failures)
+        finally:
+            # stop the loader right away if ingestion is interrupted
+            loaded_items.close()
             try:
-                stac_item = self.create_stac_item(item_name, item_data)
-            except Exception:
-                LOGGER.exception(
-                    f"Failed to create STAC item for {item_name}",
-                    extra={"item_loc": item_loc, "loader": type(self._ingest_pipeline)},
+                # post the last partial batch even if ingestion was interrupted, items in it were already created
+                if self._item_batch:
+                    batch, self._item_batch = self._item_batch, []
+                    failures += self._post_item_batch(batch)
+                    LOGGER.info("Processed %s data items. %s failures", counter, failures)
+            finally:
+                if self._owns_session:
+                    self._session.close()
+
+    def _ingest_item(self, item_name: str, item_loc: str, item_data: MutableMapping[str, Any]) -> int:
+        """Create the STAC item of a single data item and post it, or add it to the pending batch of STAC items.
+
+        :return: Number of STAC items that failed to be created or posted by this call.
+        :rtype: int
+        """
+        try:
+            stac_item = self.create_stac_item(item_name, item_data)
+        except Exception:
+            LOGGER.exception(
+                f"Failed to create STAC item for {item_name}",
+                extra={"item_loc": item_loc, "loader": type(self._ingest_pipeline)},
+            )
+            return 1
+
+        # implementations return None for data items that should not be published
+        if stac_item is None:
+            return 0
+        if not self.batch_size:
+            return int(not self._post_item(item_name, item_loc, stac_item))
+
+        with self._item_batch_lock:
+            self._item_batch.append((item_name, item_loc, stac_item))
+            if len(self._item_batch) < self.batch_size:
+                return 0
+            batch, self._item_batch = self._item_batch, []
+        return self._post_item_batch(batch)
+
+    def _post_item_batch(self, batch: List[Tuple[str, str, dict[str, Any]]]) -> int:
+        """Post a batch of STAC items at once, or one by one if the STAC API rejects the batch.
+
+        If the STAC API does not provide the bulk items endpoint, the remaining batches are posted one by one
+        without attempting the bulk request again.
+
+        :return: Number of STAC items that failed to be posted.
+        :rtype: int
+        """
+        if not self._bulk_supported:
+            return sum(not self._post_item(*entry) for entry in batch)
+        try:
+            post_stac_items_bulk(
+                self.stac_host,
+                self.collection_id,
+                [stac_item for _, _, stac_item in batch],
+                update=self.update,
+                session=self._session,
+            )
+        except Exception as exc:
+            if isinstance(exc, HTTPError) and exc.response is not None and exc.response.status_code in (404, 405):
+                self._bulk_supported = False
+                LOGGER.warning("STAC API does not support posting items in bulk, posting them one by one")
+            else:
+                LOGGER.warning(
+                    "Failed to post batch of %s STAC items, posting them one by one", len(batch), exc_info=True
                 )
-                failures += 1
-                stac_item = None
-
-            if stac_item:
-                try:
-                    post_stac_item(
-                        self.stac_host,
-                        self.collection_id,
-                        item_name,
-                        stac_item,
-                        update=self.update,
-                        session=self._session,
-                    )
-                except Exception:
-                    # Something went wrong on the server side, most likely because the STAC item generated above has
-                    # incorrect data. Writing the STAC item to file so that the issue could be diagnosed and fixed.
-                    stac_output_fname = "error_STAC_rep_" + item_name.split(".")[0] + ".json"
-                    json.dump(stac_item, open(stac_output_fname, "w"), indent=2)
-                    LOGGER.exception(
-                        f"Failed to post STAC item for {item_name}",
-                        extra={
-                            "item_loc": item_loc,
-                            "loader": type(self._ingest_pipeline),
-                            "stac_output_fname": stac_output_fname,
-                        },
-                    )
-                    failures += 1
+            return sum(not self._post_item(*entry) for entry in batch)
+        return 0
 
-            counter += 1
-            LOGGER.info(f"Processed {counter} data items. {failures} failures")
+    def _post_item(self, item_name: str, item_loc: str, stac_item: dict[str, Any]) -> bool:
+        """Post a single STAC item, writing it to file for diagnosis if the STAC API rejects it.
+
+        :return: True if the item was successfully posted, False otherwise.
+        :rtype: bool
+        """
+        try:
+            post_stac_item(
+                self.stac_host,
+                self.collection_id,
+                item_name,
+                stac_item,
+                update=self.update,
+                session=self._session,
+            )
+        except Exception:
+            # Something went wrong on the server side, most likely because the STAC item generated above has
+            # incorrect data. Writing the STAC item to file so that the issue could be diagnosed and fixed.
+            # named after the item ID, loaders may give the same name to many items (e.g. 'collection.json')
+            # and several workers could otherwise write the same file at once
+            stac_output_id = _UNSAFE_FILENAME_CHARS.sub("_", str(stac_item.get("id") or item_name.split(".")[0]))
+            stac_output_fname = f"error_STAC_rep_{stac_output_id}.json"
+            try:
+                with open(stac_output_fname, "wb") as stac_output_file:
+                    stac_output_file.write(
+                        orjson.dumps(stac_item, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+                    )
+            except OSError:
+                # the item failing to post must not stop ingestion of the others
+                LOGGER.warning("Failed to write STAC item for %s to file", item_name, exc_info=True)
+                stac_output_fname = None
+            LOGGER.exception(
+                f"Failed to post STAC item for {item_name}",
+                extra={
+                    "item_loc": item_loc,
+                    "loader": type(self._ingest_pipeline),
+                    "stac_output_fname": stac_output_fname,
+                },
+            )
+            return False
+        return True
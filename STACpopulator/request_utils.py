@@ -1,9 +1,15 @@
 import argparse
+import functools
 from http import cookiejar
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase, HTTPBasicAuth, HTTPDigestAuth, HTTPProxyAuth
 from requests.sessions import Session
+from urllib3.util.retry import Retry
+
+AUTH_HANDLERS = ("basic", "digest", "bearer", "proxy", "cookie")
+_USERNAME_PASSWORD_AUTH_HANDLERS = frozenset(["basic", "digest", "proxy"])
 
 
 class HTTPBearerTokenAuth(AuthBase):
@@ -15,6 +21,38 @@ class HTTPBearerTokenAuth(AuthBase):
         return r
 
 
+def create_session(pool_size: int = 10) -> Session:
+    """
+    Creates a request session reusing up to ``pool_size`` connections per host and retrying on transient errors.
+    """
+    session = Session()
+    mount_pooled_adapter(session, pool_size)
+    return session
+
+
+def mount_pooled_adapter(session: Session, pool_size: int = 10) -> None:
+    """
+    Mounts an adapter on a request session reusing up to ``pool_size`` connections per host and retrying on transient
+    errors for HTTP and HTTPS requests.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        # return the last response once retries are exhausted rather than raising, as requests without retries do
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+@functools.cache
+def default_session() -> Session:
+    """
+    Returns a request session shared by all requests performed without an explicitly provided session.
+    """
+    return create_session()
+
+
 def add_request_options(parser: argparse.ArgumentParser) -> None:
     """
     Adds arguments to a parser to allow update of a request session definition used across a populator procedure.
@@ -30,13 +68,21 @@ def add_request_options(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--cert", type=argparse.FileType(), help="Path to a certificate file to use.")
     parser.add_argument(
         "--auth-handler",
-        choices=["basic", "digest", "bearer", "proxy", "cookie"],
+        choices=AUTH_HANDLERS,
         help="Authentication strategy to employ for the requests session.",
     )
     parser.add_argument(
         "--auth-identity",
         help="Bearer token, cookie-jar file or proxy/digest/basic username:password for selected authorization handler.",
     )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        help=(
+            "Maximum number of connections kept open per host for reuse by the requests session. "
+            "By default, one more than the number of concurrent ingestion workers (and at least 10)."
+        ),
+    )
 
 
 def apply_request_options(session: Session, namespace: argparse.Namespace) -> None:
@@ -45,7 +91,12 @@ def apply_request_options(session: Session, namespace: argparse.Namespace) -> No
     """
     session.verify = namespace.verify
     session.cert = namespace.cert
-    if namespace.auth_handler in ["basic", "digest", "proxy"]:
+    # ingestion workers and the loader thread all share the session, size its pool for them unless overridden
+    pool_size = getattr(namespace, "pool_size", None)
+    if pool_size is None:
+        pool_size = max(getattr(namespace, "max_workers", 0) + 1, 10)
+    mount_pooled_adapter(session, pool_size)
+    if namespace.auth_handler in _USERNAME_PASSWORD_AUTH_HANDLERS:
         usr, pwd = namespace.auth_identity.split(":", 1)
         if namespace.auth_handler == "basic":
             session.auth = HTTPBasicAuth(usr, pwd)
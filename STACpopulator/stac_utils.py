@@ -1,8 +1,10 @@
+import copy
+import functools
 import logging
 import os
 import re
 from enum import Enum
-from typing import Any, Literal, MutableMapping, Type, Union
+from typing import Any, Callable, Literal, MutableMapping, Optional, Type, Union
 
 import numpy as np
 import pystac
@@ -10,7 +12,23 @@ import yaml
 
 LOGGER = logging.getLogger(__name__)
 
+# libyaml C parser when available, configuration files do not need arbitrary python object construction
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
+
+URL_REGEX = re.compile(
+    r"^(?:http|ftp)s?://"  # http:// or https://
+    # domain...
+    r"(?:(?:[A-Z\d](?:[A-Z\d-]{0,61}[A-Z\d])?\.)+(?:[A-Z]{2,6}\.?|[A-Z\d-]{2,}\.?)|"
+    r"localhost|"  # localhost...
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
+    r"(?::\d+)?"  # optional port
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=64)
 def url_validate(target: str) -> bool:
     """Validate whether a supplied URL is reliably written.
 
@@ -22,17 +40,7 @@ def url_validate(target: str) -> bool:
     ----------
     https://stackoverflow.com/a/7160778/7322852
     """
-    url_regex = re.compile(
-        r"^(?:http|ftp)s?://"  # http:// or https://
-        # domain...
-        r"(?:(?:[A-Z\d](?:[A-Z\d-]{0,61}[A-Z\d])?\.)+(?:[A-Z]{2,6}\.?|[A-Z\d-]{2,}\.?)|"
-        r"localhost|"  # localhost...
-        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
-        r"(?::\d+)?"  # optional port
-        r"(?:/?|[/?]\S+)$",
-        re.IGNORECASE,
-    )
-    return True if re.match(url_regex, target) else False
+    return URL_REGEX.match(target) is not None
 
 
 def load_config(
@@ -40,6 +48,8 @@ def load_config(
 ) -> MutableMapping[str, Any]:
     """Reads a generic YAML or JSON configuration file.
 
+    Parsed files are cached by path, modification time and size, such that a same unmodified file is parsed only once.
+
     :raises OSError: If the configuration file is not present
     :raises ValueError: If the configuration file is not correctly formatted.
     :return: A python dictionary describing a generic configuration.
@@ -48,8 +58,19 @@ def load_config(
     if not os.path.isfile(config_file):
         raise OSError(f"Missing configuration file does not exist: [{config_file}]")
 
+    # absolute path avoids mixing up same relative paths resolved from different working directories
+    config_path = os.path.abspath(config_file)
+    # size catches rewrites within the modification time resolution of the file system
+    config_stat = os.stat(config_path)
+    config_info = _parse_config(config_path, config_stat.st_mtime_ns, config_stat.st_size)
+    # callers are free to modify the configuration, keep the cached one untouched
+    return copy.deepcopy(config_info)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config(config_file: str, mtime_ns: int, size: int) -> MutableMapping[str, Any]:
     with open(config_file) as f:
-        config_info = yaml.load(f, yaml.Loader)
+        config_info = yaml.load(f, _YAML_LOADER)
 
     if not isinstance(config_info, dict) or not config_info:
         raise ValueError(f"Invalid configuration file does not define a mapping: [{config_file}]")
@@ -63,31 +84,16 @@ def collection2literal(collection, property="label") -> "Type[Literal]":
 
 def ncattrs_to_geometry(attrs: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     """Create Polygon geometry from CFMetadata."""
-    attrs = attrs["groups"]["CFMetadata"]["attributes"]
+    lon_min, lat_min, lon_max, lat_max = ncattrs_to_bbox(attrs)
     return {
         "type": "Polygon",
         "coordinates": [
             [
-                [
-                    float(attrs["geospatial_lon_min"][0]),
-                    float(attrs["geospatial_lat_min"][0]),
-                ],
-                [
-                    float(attrs["geospatial_lon_min"][0]),
-                    float(attrs["geospatial_lat_max"][0]),
-                ],
-                [
-                    float(attrs["geospatial_lon_max"][0]),
-                    float(attrs["geospatial_lat_max"][0]),
-                ],
-                [
-                    float(attrs["geospatial_lon_max"][0]),
-                    float(attrs["geospatial_lat_min"][0]),
-                ],
-                [
-                    float(attrs["geospatial_lon_min"][0]),
-                    float(attrs["geospatial_lat_min"][0]),
-                ],
+                [lon_min, lat_min],
+                [lon_min, lat_max],
+                [lon_max, lat_max],
+                [lon_max, lat_min],
+                [lon_min, lat_min],
             ]
         ],
     }
@@ -104,21 +110,33 @@ def ncattrs_to_bbox(attrs: MutableMapping[str, Any]) -> list[float]:
     ]
 
 
+@functools.cache
+def _numpy_converter(value_type: type) -> Optional[Callable[[Any], Any]]:
+    """Python type converter for a numpy scalar type, or ``None`` if values of that type are kept as is."""
+    if issubclass(value_type, np.integer):
+        return int
+    if issubclass(value_type, np.floating):
+        return float
+    if issubclass(value_type, np.generic):
+        return value_type.item
+    return None
+
+
+def _to_python_datatype(value: Any) -> Any:
+    convert = _numpy_converter(type(value))
+    return value if convert is None else convert(value)
+
+
 def numpy_to_python_datatypes(data: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     # Converting numpy datatypes to python standard datatypes
     for key, value in data.items():
         if isinstance(value, list):
-            newlist = []
-            for item in value:
-                if issubclass(type(item), np.integer):
-                    newlist.append(int(item))
-                elif issubclass(type(item), np.floating):
-                    newlist.append(float(item))
-                else:
-                    newlist.append(item)
-            data[key] = newlist
-        elif isinstance(type(value), np.integer):
-            data[key] = int(value)
+            data[key] = [_to_python_datatype(item) for item in value]
+        elif isinstance(value, np.ndarray):
+            # converted element-wise by numpy itself
+            data[key] = value.tolist()
+        else:
+            data[key] = _to_python_datatype(value)
 
     return data
 
@@ -170,12 +188,13 @@ class ServiceType(Enum):
     @classmethod
     def from_value(cls, value: str, default: Any = KeyError) -> "ServiceType":
         """Return value irrespective of case."""
-        try:
-            svc = value.lower()
-            if svc.endswith("_service"):  # handle NCML edge cases
-                svc = svc.rsplit("_", 1)[0]
-            return cls[svc]
-        except KeyError:
-            if default is not KeyError:
-                return default
-            raise
+        svc = value.lower()
+        if svc.endswith("_service"):  # handle NCML edge cases
+            svc = svc.rsplit("_", 1)[0]
+        # member names are all lowercase, look them up without raising on the common miss of non-service fields
+        member = cls.__members__.get(svc)
+        if member is not None:
+            return member
+        if default is not KeyError:
+            return default
+        raise KeyError(svc)
@@ -81,12 +81,12 @@ class _TestDirectoryLoader(abc.ABC):
     ):
         runner()
 
-        assert len(request_mock.calls) == (4 if prune_option else 8)
+        assert len(request_mock.calls) == (4 if prune_option else 7)
         assert request_mock.calls[0].request.url == namespace.stac_host
 
         base_col = file_id_map["collection.json"]
         assert request_mock.calls[1].request.path_url == "/stac/collections"
-        assert request_mock.calls[1].request.body == file_contents["collection.json"]
+        assert json.loads(request_mock.calls[1].request.body) == json.loads(file_contents["collection.json"])
 
         # NOTE:
         #   Because directory crawler users 'os.walk', loading order is OS-dependant.
@@ -96,30 +96,29 @@ class _TestDirectoryLoader(abc.ABC):
         item0_idx, item1_idx = (2, 3) if "sample-0" in req0_item else (3, 2)
 
         assert request_mock.calls[item0_idx].request.path_url == f"/stac/collections/{base_col}/items"
-        assert request_mock.calls[item0_idx].request.body == file_contents["item-0.json"]
+        assert json.loads(request_mock.calls[item0_idx].request.body) == json.loads(file_contents["item-0.json"])
 
         assert request_mock.calls[item1_idx].request.path_url == f"/stac/collections/{base_col}/items"
-        assert request_mock.calls[item1_idx].request.body == file_contents["item-1.json"]
+        assert json.loads(request_mock.calls[item1_idx].request.body) == json.loads(file_contents["item-1.json"])
 
         if not prune_option:
-            assert request_mock.calls[4].request.url == namespace.stac_host
-
+            # STAC host was already validated with the same session, only the nested collection and items are posted
             nested_col = file_id_map["nested/collection.json"]
-            assert request_mock.calls[5].request.path_url == "/stac/collections"
-            assert request_mock.calls[5].request.body == file_contents["nested/collection.json"]
+            assert request_mock.calls[4].request.path_url == "/stac/collections"
+            assert json.loads(request_mock.calls[4].request.body) == json.loads(file_contents["nested/collection.json"])
 
             # NOTE:
             #   Because directory crawler users 'os.walk', loading order is OS-dependant.
             #   Since the order does not actually matter, consider item indices interchangeably.
-            req0_json = json.loads(request_mock.calls[6].request.body.decode())
+            req0_json = json.loads(request_mock.calls[5].request.body.decode())
             req0_item = req0_json["id"]
-            item0_idx, item1_idx = (6, 7) if "sample-0" in req0_item else (7, 6)
+            item0_idx, item1_idx = (5, 6) if "sample-0" in req0_item else (6, 5)
 
             assert request_mock.calls[item0_idx].request.path_url == f"/stac/collections/{nested_col}/items"
-            assert request_mock.calls[item0_idx].request.body == file_contents["nested/item-0.json"]
+            assert json.loads(request_mock.calls[item0_idx].request.body) == json.loads(file_contents["nested/item-0.json"])
 
             assert request_mock.calls[item1_idx].request.path_url == f"/stac/collections/{nested_col}/items"
-            assert request_mock.calls[item1_idx].request.body == file_contents["nested/item-1.json"]
+            assert json.loads(request_mock.calls[item1_idx].request.body) == json.loads(file_contents["nested/item-1.json"])
 
 
 class TestModule(_TestDirectoryLoader):
@@ -137,6 +136,8 @@ class TestModule(_TestDirectoryLoader):
             directory=os.path.join(request.fspath.dirname, "data/test_directory"),
             prune=prune_option,
             update=True,
+            max_workers=8,
+            batch_size=None,
         )
 
 
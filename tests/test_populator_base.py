@@ -0,0 +1,309 @@
+import argparse
+import gc
+import itertools
+import json
+import logging
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Iterator, MutableMapping, Optional, Tuple
+
+import pytest
+import responses
+from requests import Session
+
+from STACpopulator.api_requests import post_stac_items_bulk
+from STACpopulator.input import GenericLoader
+from STACpopulator.models import GeoJSONPolygon
+from STACpopulator import populator_base
+from STACpopulator.populator_base import STACpopulatorBase, _prefetch, add_ingest_options
+
+STAC_HOST = "http://example.com/stac/"
+COLLECTION_ID = "test-collection"
+ITEMS_URL = f"{STAC_HOST}collections/{COLLECTION_ID}/items"
+BULK_ITEMS_URL = f"{STAC_HOST}collections/{COLLECTION_ID}/bulk_items"
+
+
+class ItemLoader(GenericLoader):
+    def __init__(self, count: int, fail_at: Optional[int] = None, item_name: Optional[str] = None) -> None:
+        super().__init__()
+        self.count = count
+        self.fail_at = fail_at
+        self.item_name = item_name
+
+    def __iter__(self) -> Iterator[Tuple[str, str, MutableMapping[str, Any]]]:
+        for index in range(self.count):
+            if index == self.fail_at:
+                raise RuntimeError(f"Failed to load item {index}")
+            item_name = self.item_name or f"item-{index}.nc"
+            yield item_name, f"/data/item-{index}.nc", {"id": f"item-{index}", "index": index}
+
+    def reset(self) -> None:
+        pass
+
+
+class ItemPopulator(STACpopulatorBase):
+    item_geometry_model = GeoJSONPolygon
+
+    def load_config(self) -> None:
+        self._collection_info = {"id": COLLECTION_ID, "title": "Test Collection"}
+
+    def create_stac_collection(self) -> MutableMapping[str, Any]:
+        self.publish_stac_collection(self._collection_info)
+        return self._collection_info
+
+    def create_stac_item(self, item_name: str, item_data: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        return dict(item_data)
+
+
+class PartialItemPopulator(ItemPopulator):
+    """Fails to create every third item and skips the one following it."""
+
+    def create_stac_item(self, item_name: str, item_data: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        if item_data["index"] % 3 == 0:
+            raise ValueError(f"Cannot create {item_name}")
+        if item_data["index"] % 3 == 1:
+            return None
+        return dict(item_data)
+
+
+@pytest.fixture(autouse=True)
+def request_mock() -> Iterator[responses.RequestsMock]:
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as mock_context:
+        mock_context.add("GET", STAC_HOST, json={"stac_version": "1.0.0", "type": "Catalog"})
+        mock_context.add("POST", f"{STAC_HOST}collections")
+        mock_context.add("POST", ITEMS_URL)
+        yield mock_context
+
+
+def bulk_requests(request_mock: responses.RequestsMock) -> list[dict[str, Any]]:
+    return [json.loads(call.request.body) for call in request_mock.calls if call.request.url == BULK_ITEMS_URL]
+
+
+def item_requests(request_mock: responses.RequestsMock) -> list[dict[str, Any]]:
+    return [json.loads(call.request.body) for call in request_mock.calls if call.request.url == ITEMS_URL]
+
+
+@pytest.mark.parametrize(["update", "method"], [(True, "upsert"), (False, "insert")])
+def test_post_stac_items_bulk(request_mock: responses.RequestsMock, update: bool, method: str):
+    request_mock.add("POST", BULK_ITEMS_URL)
+    items = [{"id": "item-0", "type": "Feature"}, {"id": "item-1", "type": "Feature"}]
+    post_stac_items_bulk(STAC_HOST, COLLECTION_ID, items, update=update)
+
+    assert bulk_requests(request_mock) == [{"items": {"item-0": items[0], "item-1": items[1]}, "method": method}]
+    assert request_mock.calls[-1].request.headers["Content-Type"] == "application/json"
+
+
+def test_ingest_bulk_items(request_mock: responses.RequestsMock):
+    request_mock.add("POST", BULK_ITEMS_URL)
+    ItemPopulator(STAC_HOST, ItemLoader(7), batch_size=3, max_workers=2).ingest()
+
+    batches = bulk_requests(request_mock)
+    # the last partial batch is flushed once all items were created
+    assert sorted(len(batch["items"]) for batch in batches) == [1, 3, 3]
+    assert {item_id for batch in batches for item_id in batch["items"]} == {f"item-{i}" for i in range(7)}
+    assert not item_requests(request_mock)
+
+
+def test_ingest_bulk_items_rejected(request_mock: responses.RequestsMock):
+    request_mock.add("POST", BULK_ITEMS_URL, status=500)
+    populator = ItemPopulator(STAC_HOST, ItemLoader(7), batch_size=3, max_workers=2)
+    populator.ingest()
+
+    # every batch is attempted, and its items are posted one by one when rejected
+    assert len(bulk_requests(request_mock)) == 3
+    assert sorted(item["id"] for item in item_requests(request_mock)) == [f"item-{i}" for i in range(7)]
+    assert populator._bulk_supported
+
+
+@pytest.mark.parametrize("status", [404, 405])
+def test_ingest_bulk_items_unsupported(request_mock: responses.RequestsMock, status: int):
+    request_mock.add("POST", BULK_ITEMS_URL, status=status)
+    populator = ItemPopulator(STAC_HOST, ItemLoader(7), batch_size=3, max_workers=1)
+    populator.ingest()
+
+    # bulk endpoint is not attempted again once the STAC API reported it as unavailable
+    assert len(bulk_requests(request_mock)) == 1
+    assert sorted(item["id"] for item in item_requests(request_mock)) == [f"item-{i}" for i in range(7)]
+    assert not populator._bulk_supported
+
+
+def test_ingest_bulk_items_flushed_on_loader_error(request_mock: responses.RequestsMock):
+    request_mock.add("POST", BULK_ITEMS_URL)
+    populator = ItemPopulator(STAC_HOST, ItemLoader(10, fail_at=7), batch_size=10, max_workers=2)
+    with pytest.raises(RuntimeError, match="Failed to load item 7"):
+        populator.ingest()
+
+    batches = bulk_requests(request_mock)
+    assert [sorted(batch["items"]) for batch in batches] == [[f"item-{i}" for i in range(7)]]
+
+
+def loader_threads() -> list[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name == "STACpopulator-loader"]
+
+
+@pytest.mark.parametrize("error", [RuntimeError, SystemExit])
+def test_prefetch_reraises_loader_error(error: type[BaseException]):
+    def entries() -> Iterator[int]:
+        yield from range(3)
+        raise error("loader failure")
+
+    consumed = []
+    with pytest.raises(error, match="loader failure"):
+        for entry in _prefetch(entries(), maxsize=1):
+            consumed.append(entry)
+    assert consumed == [0, 1, 2]
+
+
+def test_prefetch_stops_loader_when_closed():
+    loaded = []
+
+    def entries() -> Iterator[int]:
+        for entry in itertools.count():
+            loaded.append(entry)
+            yield entry
+
+    prefetched = _prefetch(entries(), maxsize=2)
+    assert next(prefetched) == 0
+    prefetched.close()
+    for thread in loader_threads():
+        thread.join(timeout=5)
+    assert not loader_threads()
+    # only the entries that fit in the buffer (and the one waiting for room) were loaded
+    assert len(loaded) <= 4
+
+
+def test_owned_session_closed_on_init_error(request_mock: responses.RequestsMock, monkeypatch: pytest.MonkeyPatch):
+    sessions = []
+    closed = []
+
+    def create_session(pool_size: int) -> Session:
+        session = Session()
+        monkeypatch.setattr(session, "close", lambda: closed.append(session))
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(populator_base, "create_session", create_session)
+    request_mock.replace("POST", f"{STAC_HOST}collections", status=500)
+    with pytest.raises(Exception):
+        ItemPopulator(STAC_HOST, ItemLoader(1))
+    assert len(sessions) == 1
+    assert closed == sessions
+
+
+def test_validated_host_cache_does_not_retain_sessions(request_mock: responses.RequestsMock):
+    session = Session()
+    ItemPopulator(STAC_HOST, ItemLoader(0), session=session)
+    ItemPopulator(STAC_HOST, ItemLoader(0), session=session)
+    # host is only checked once for populators sharing a session
+    assert len([call for call in request_mock.calls if call.request.method == "GET"]) == 1
+
+    session_ref = weakref.ref(session)
+    del session
+    gc.collect()
+    assert session_ref() is None
+
+
+def reject_items(*item_ids: str) -> Callable:
+    def callback(request: Any) -> Tuple[int, dict, str]:
+        return (400 if json.loads(request.body)["id"] in item_ids else 200), {}, ""
+
+    return callback
+
+
+def test_ingest_concurrent_failures(
+    request_mock: responses.RequestsMock,
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    monkeypatch.chdir(tmp_path)
+    request_mock.remove("POST", ITEMS_URL)
+    request_mock.add_callback("POST", ITEMS_URL, callback=reject_items("item-5"))
+    with caplog.at_level(logging.INFO, logger=populator_base.__name__):
+        PartialItemPopulator(STAC_HOST, ItemLoader(9), max_workers=4).ingest()
+
+    # skipped items are not posted, items failing creation are never posted either
+    assert sorted(item["id"] for item in item_requests(request_mock)) == ["item-2", "item-5", "item-8"]
+    progress = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Processed")]
+    assert progress[-1] == "Processed 9 data items. 4 failures"
+    with open(tmp_path / "error_STAC_rep_item-5.json") as error_file:
+        assert json.load(error_file) == {"id": "item-5", "index": 5}
+
+
+def test_ingest_error_files_named_by_item_id(
+    request_mock: responses.RequestsMock, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    request_mock.remove("POST", ITEMS_URL)
+    request_mock.add_callback("POST", ITEMS_URL, callback=reject_items(*(f"item-{i}" for i in range(8))))
+    # same name for every item, as yielded by the directory loader
+    ItemPopulator(STAC_HOST, ItemLoader(8, item_name="collection.json"), max_workers=4).ingest()
+
+    assert sorted(os.listdir(tmp_path)) == sorted(f"error_STAC_rep_item-{i}.json" for i in range(8))
+
+
+class PathItemPopulator(ItemPopulator):
+    """Creates items with IDs that are not valid file names."""
+
+    def create_stac_item(self, item_name: str, item_data: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        return {**item_data, "id": f"CMIP6/{item_data['id']}"}
+
+
+def test_ingest_error_files_sanitized(
+    request_mock: responses.RequestsMock, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    request_mock.remove("POST", ITEMS_URL)
+    request_mock.add_callback("POST", ITEMS_URL, callback=reject_items("CMIP6/item-1"))
+    PathItemPopulator(STAC_HOST, ItemLoader(4), max_workers=2).ingest()
+
+    assert os.listdir(tmp_path) == ["error_STAC_rep_CMIP6_item-1.json"]
+    assert len(item_requests(request_mock)) == 4
+
+
+def test_ingest_error_file_write_failure(
+    request_mock: responses.RequestsMock, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+):
+    def fail_open(*_: Any, **__: Any) -> None:
+        raise PermissionError("read-only directory")
+
+    monkeypatch.setattr(populator_base, "open", fail_open, raising=False)
+    request_mock.remove("POST", ITEMS_URL)
+    request_mock.add_callback("POST", ITEMS_URL, callback=reject_items("item-1", "item-2"))
+    with caplog.at_level(logging.INFO, logger=populator_base.LOGGER.name):
+        ItemPopulator(STAC_HOST, ItemLoader(4), max_workers=2).ingest()
+
+    assert len(item_requests(request_mock)) == 4
+    progress = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Processed")]
+    assert progress[-1] == "Processed 4 data items. 2 failures"
+
+
+@pytest.mark.parametrize("option", ["--max-workers", "--batch-size"])
+@pytest.mark.parametrize("value", ["0", "-2", "two"])
+def test_ingest_options_not_positive(option: str, value: str):
+    parser = argparse.ArgumentParser()
+    add_ingest_options(parser)
+    with pytest.raises(SystemExit):
+        parser.parse_args([option, value])
+
+
+@pytest.mark.parametrize("options", [{"max_workers": 0}, {"batch_size": -1}])
+def test_ingest_options_validated_before_publishing(request_mock: responses.RequestsMock, options: dict[str, int]):
+    with pytest.raises(ValueError, match="must be a positive integer"):
+        ItemPopulator(STAC_HOST, ItemLoader(1), **options)
+    assert not request_mock.calls
+
+
+def test_missing_config_definitions(tmp_path: Path):
+    class ConfigPopulator(ItemPopulator):
+        load_config = STACpopulatorBase.load_config
+
+    config_path = tmp_path / "collection_config.yml"
+    config_path.write_text("title: Test\nid: test\ndescription: Test\n")
+    with pytest.raises(RuntimeError) as exc_info:
+        ConfigPopulator(STAC_HOST, ItemLoader(1), config_file=str(config_path))
+    assert str(exc_info.value) == (
+        f"Missing required definitions keywords, license in the configuration file [{config_path}]"
+    )
@@ -0,0 +1,39 @@
+import argparse
+
+import pytest
+import responses
+from requests import Session
+from urllib3.util.retry import Retry
+
+from STACpopulator.api_requests import stac_collection_exists
+from STACpopulator.request_utils import apply_request_options, create_session
+
+
+@pytest.mark.parametrize(
+    ["options", "pool_size"],
+    [
+        ({}, 10),
+        ({"max_workers": 4, "pool_size": None}, 10),
+        ({"max_workers": 16, "pool_size": None}, 17),
+        ({"max_workers": 16, "pool_size": 4}, 4),
+    ],
+)
+def test_apply_request_options_pool_size(options: dict, pool_size: int):
+    namespace = argparse.Namespace(verify=True, cert=None, auth_handler=None, **options)
+    with Session() as session:
+        apply_request_options(session, namespace)
+        for url in ["http://example.com", "https://example.com"]:
+            assert session.get_adapter(url)._pool_maxsize == pool_size
+
+
+@responses.activate
+def test_retries_return_last_response(monkeypatch):
+    monkeypatch.setattr(Retry, "sleep", lambda *_, **__: None)
+    url = "http://example.com/stac/collections/test"
+    responses.get(url, status=503)
+    with create_session() as session:
+        response = session.get(url)
+        assert response.status_code == 503
+        assert not stac_collection_exists("http://example.com/stac", "test", session=session)
+    # first attempt and 3 retries for each request
+    assert len(responses.calls) == 8
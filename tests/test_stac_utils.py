@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from STACpopulator.stac_utils import load_config, numpy_to_python_datatypes
+
+
+def test_load_config_cached_copy(tmp_path):
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("id: test\nkeywords: [a, b]\n")
+
+    config = load_config(config_path)
+    assert config == {"id": "test", "keywords": ["a", "b"]}
+
+    # modifying the loaded configuration must not affect later loads of the same file
+    config.pop("id")
+    config["keywords"].append("c")
+    assert load_config(config_path) == {"id": "test", "keywords": ["a", "b"]}
+
+
+def test_load_config_reloads_modified_file(tmp_path):
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("id: before\n")
+    assert load_config(config_path) == {"id": "before"}
+
+    config_path.write_text("id: after\n")
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_config(config_path) == {"id": "after"}
+
+
+def test_load_config_reloads_resized_file(tmp_path):
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("id: before\n")
+    stat = os.stat(config_path)
+    assert load_config(config_path) == {"id": "before"}
+
+    # rewritten within the same modification time, as can happen on file systems with coarse timestamps
+    config_path.write_text("id: rewritten\n")
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_config(config_path) == {"id": "rewritten"}
+
+
+def test_load_config_invalid(tmp_path):
+    with pytest.raises(OSError):
+        load_config(tmp_path / "missing.yml")
+
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("- not\n- a mapping\n")
+    with pytest.raises(ValueError):
+        load_config(config_path)
+
+
+def test_numpy_to_python_datatypes():
+    data = {
+        "int": np.int32(1),
+        "float": np.float32(0.5),
+        "list": [np.int64(2), np.float64(1.5), "text"],
+        "text": "value",
+        "bool": np.bool_(True),
+        "array": np.array([1, 2], dtype=np.int16),
+    }
+    result = numpy_to_python_datatypes(data)
+    assert result == {
+        "int": 1,
+        "float": 0.5,
+        "list": [2, 1.5, "text"],
+        "text": "value",
+        "bool": True,
+        "array": [1, 2],
+    }
+    assert type(result["bool"]) is bool
+    assert [type(item) for item in result["array"]] == [int, int]
+    assert type(result["int"]) is int
+    assert type(result["float"]) is float
+    assert [type(item) for item in result["list"]] == [int, float, str]